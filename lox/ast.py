@@ -1,10 +1,10 @@
 from abc import ABC
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Callable
 
 from .ctx import Ctx
 from .node import Node
-from .runtime import LoxReturn, LoxFunction
+from .runtime import LoxReturn, LoxFunction, truthy, _scope_pool, _SCOPE_POOL_MAX
 
 
 Value = bool | str | float | None
@@ -12,29 +12,32 @@ Value = bool | str | float | None
 def is_implicit_int(name: str) -> bool:
     return name and name[0] in "ijklmn"
 
+def coerce_int(value: Value) -> Value:
+    """
+    Conversão aplicada a variáveis de nome implicitamente inteiro.
+
+    O teste `is_implicit_int(name)` é estático por nó, então quem chama
+    decide uma única vez (na construção do nó ou na compilação) se a
+    conversão é necessária.
+    """
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    if isinstance(value, (bool, float)):
+        return int(value)
+    return value
+
 def auto_convert(name: str, value: Value) -> Value:
     if is_implicit_int(name):
-        if isinstance(value, str) and value.isdigit():
-            return int(value)
-        if isinstance(value, float):
-            return int(value)
-        if isinstance(value, bool):
-            return int(value)
+        return coerce_int(value)
     return value
 
 
 
 
-def is_truthy(value: Value) -> bool:
-    """
-    Verifica se um valor é "verdadeiro" de acordo com as regras do Lox.
-    Apenas `nil` e `false` são considerados falsos.
-    """
-    if value is None:
-        return False
-    if isinstance(value, bool):
-        return value
-    return True
+# Apenas `nil` e `false` são falsos; a regra vive em `runtime.truthy`
+# (testes de identidade, sem isinstance) e este é só um apelido para
+# não manter duas cópias dela.
+is_truthy = truthy
 
 
 def lox_str(value: Value) -> str:
@@ -43,10 +46,12 @@ def lox_str(value: Value) -> str:
     """
     if value is None:
         return "nil"
-    if isinstance(value, bool):
-        return str(value).lower()  
-    if isinstance(value, float) and value.is_integer():
-        return str(int(value)) 
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if type(value) is float and value.is_integer():
+        return str(int(value))
     return str(value)
 
 
@@ -54,19 +59,27 @@ def lox_str(value: Value) -> str:
 class Expr(Node, ABC):
     """Classe base para expressões."""
 
+    __slots__ = ()
+
 class Stmt(Node, ABC):
     """Classe base para comandos."""
 
+    __slots__ = ()
+
 @dataclass
 class Program(Node):
     """Representa um programa."""
     stmts: list[Stmt]
 
+    # Bytecode compilado na primeira avaliação (ver lox.bytecode).
+    _chunk = None
+
     def eval(self, ctx: Ctx):
-        for stmt in self.stmts:
-            stmt.eval(ctx)
+        from .bytecode import run_program
 
-@dataclass
+        return run_program(self, ctx)
+
+@dataclass(slots=True)
 class DoWhileStmt(Stmt):
     body: Stmt
     condition: Expr
@@ -74,13 +87,14 @@ class DoWhileStmt(Stmt):
     def eval(self, ctx: Ctx):
         while True:
             self.body.eval(ctx)
-            if not is_truthy(self.condition.eval(ctx)):
+            value = self.condition.eval(ctx)
+            if value is None or value is False:
                 break
 
 
 
 
-@dataclass
+@dataclass(slots=True)
 class BinOp(Expr):
     """Uma operação infixa com dois operandos."""
     left: Expr
@@ -99,18 +113,28 @@ class BinOp(Expr):
         
         return result
 
-@dataclass
+@dataclass(slots=True)
 class Var(Expr):
     """Uma variável no código."""
     name: str
 
+    # Célula (ctx, escopo, versão): enquanto o mesmo Ctx for usado e
+    # nenhum `var_def` acontecer, a resolução anterior continua válida e
+    # a leitura vira um único acesso de dicionário.
+    _cell: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
     def eval(self, ctx: Ctx):
-        try:
-            return ctx[self.name]
-        except KeyError:
+        cell = self._cell
+        if cell is not None and cell[0] is ctx and cell[2] == Ctx._defs_version:
+            return cell[1][self.name]
+
+        scope = ctx.find_scope(self.name)
+        if scope is None:
             raise NameError(f"variável {self.name} não existe!")
+        self._cell = (ctx, scope, Ctx._defs_version)
+        return scope[self.name]
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expr):
     """Representa valores literais no código."""
     value: Value
@@ -120,20 +144,21 @@ class Literal(Expr):
 
 
 
-@dataclass
+@dataclass(slots=True)
 class And(Expr):
     """Operador lógico 'and' com curto-circuito."""
     left: Expr
     right: Expr
 
     def eval(self, ctx: Ctx):
+        # Teste de veracidade inline (só nil e false são falsos): cada
+        # decisão de controle economiza uma chamada de função.
         left_value = self.left.eval(ctx)
-
-        if not is_truthy(left_value):
+        if left_value is None or left_value is False:
             return left_value
         return self.right.eval(ctx)
 
-@dataclass
+@dataclass(slots=True)
 class Or(Expr):
     """Operador lógico 'or' com curto-circuito."""
     left: Expr
@@ -141,12 +166,11 @@ class Or(Expr):
 
     def eval(self, ctx: Ctx):
         left_value = self.left.eval(ctx)
-        # Usa a nossa nova função is_truthy
-        if is_truthy(left_value):
+        if left_value is not None and left_value is not False:
             return left_value
         return self.right.eval(ctx)
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Expr):
     """Uma operação prefixa com um operando."""
     op: Callable
@@ -156,38 +180,99 @@ class UnaryOp(Expr):
         v = self.value.eval(ctx)
         return self.op(v)
 
-@dataclass
+@dataclass(slots=True)
 class Call(Expr):
     """Uma chamada de função."""
     obj: Expr
     params: list[Expr]
-    
+
+    # Aridade congelada na construção: o despacho abaixo vira uma
+    # comparação de inteiros.
+    _arity: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._arity = len(self.params)
+
     def eval(self, ctx: Ctx):
         obj = self.obj.eval(ctx)
-        params = [param.eval(ctx) for param in self.params]
-        
-        if callable(obj):
-            return obj(*params)
+        params = self.params
+
+        # Caminhos especializados por aridade: argumentos passados
+        # direto na chamada, sem alocar lista intermediária. Os
+        # argumentos são sempre avaliados antes do teste de `callable`,
+        # como no caminho genérico.
+        arity = self._arity
+        if arity == 0:
+            if callable(obj):
+                return obj()
+        elif arity == 1:
+            a0 = params[0].eval(ctx)
+            if callable(obj):
+                return obj(a0)
+        elif arity == 2:
+            a0 = params[0].eval(ctx)
+            a1 = params[1].eval(ctx)
+            if callable(obj):
+                return obj(a0, a1)
+        elif arity == 3:
+            a0 = params[0].eval(ctx)
+            a1 = params[1].eval(ctx)
+            a2 = params[2].eval(ctx)
+            if callable(obj):
+                return obj(a0, a1, a2)
+        else:
+            args = [param.eval(ctx) for param in params]
+            if callable(obj):
+                return obj(*args)
         raise TypeError(f"{self.obj} não é uma função!")
 
-@dataclass
+@dataclass(slots=True)
 class This(Expr):
     """Acesso ao `this`."""
 
-@dataclass
+@dataclass(slots=True)
 class Super(Expr):
     """Acesso a method ou atributo da superclasse."""
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Expr):
     """Atribuição de variável."""
     name: str
     value: Expr
 
+    # Decidido uma única vez na construção; nomes fora de i..n pulam a
+    # conversão implícita por completo.
+    _implicit: bool = field(init=False, repr=False, compare=False)
+
+    # Mesma célula de resolução usada em `Var`, mas para escrita.
+    _cell: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._implicit = bool(is_implicit_int(self.name))
+
     def eval(self, ctx: Ctx):
         v = self.value.eval(ctx)
-        v = auto_convert(self.name, v)
-        ctx[self.name] = v
+        if self._implicit:
+            v = coerce_int(v)
+
+        cell = self._cell
+        if cell is not None and cell[0] is ctx and cell[2] == Ctx._defs_version:
+            scope = cell[1]
+            # Sobrescrever uma função invalida caches de memoização
+            # (ver Ctx._defs_version); a resolução em si segue válida.
+            if callable(scope[self.name]):
+                Ctx._defs_version += 1
+                self._cell = (ctx, scope, Ctx._defs_version)
+            scope[self.name] = v
+            return v
+
+        scope = ctx.find_scope(self.name)
+        if scope is None:
+            raise KeyError(f"Variable '{self.name}' not found in context.")
+        if callable(scope[self.name]):
+            Ctx._defs_version += 1
+        self._cell = (ctx, scope, Ctx._defs_version)
+        scope[self.name] = v
         return v
 
 @dataclass
@@ -196,10 +281,36 @@ class Getattr(Expr):
     value: Expr
     attr: str
 
+    # Cache inline por nó: lembra o último tipo visto e a função que
+    # resolve o atributo para ele, evitando refazer `getattr` (busca no
+    # dicionário + caminhada na MRO) a cada avaliação.
+    _cached_type = None
+    _cached_fn = None
+
     def eval(self, ctx):
         obj = self.value.eval(ctx)
-        return getattr(obj, self.attr)
-        
+        if type(obj) is self._cached_type:
+            return self._cached_fn(obj)
+        return self._eval_slow(obj)
+
+    def _eval_slow(self, obj):
+        name = self.attr
+        if name in getattr(obj, "__dict__", ()):
+
+            def fn(o):
+                try:
+                    return o.__dict__[name]
+                except KeyError:
+                    return getattr(o, name)
+        else:
+
+            def fn(o):
+                return getattr(o, name)
+
+        self._cached_type = type(obj)
+        self._cached_fn = fn
+        return fn(obj)
+
 @dataclass
 class Setattr(Expr):
     """Atribuição de atributo de um objeto."""
@@ -207,16 +318,49 @@ class Setattr(Expr):
     attr: str
     value: Expr
 
+    # Cache inline análogo ao de Getattr, mas para escrita.
+    _cached_type = None
+    _cached_fn = None
+
+    _implicit: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._implicit = bool(is_implicit_int(self.attr))
+
     def eval(self, ctx: Ctx):
         obj = self.obj.eval(ctx)
         v = self.value.eval(ctx)
-        v = auto_convert(self.attr, v)
-        setattr(obj, self.attr, v)
+        if self._implicit:
+            v = coerce_int(v)
+        if type(obj) is self._cached_type:
+            self._cached_fn(obj, v)
+        else:
+            self._eval_slow(obj, v)
         return v
 
+    def _eval_slow(self, obj, v):
+        name = self.attr
+        cls = type(obj)
 
+        # Só podemos escrever direto em `__dict__` se nenhum ancestral
+        # define o atributo como data descriptor (ex.: property).
+        descr = getattr(cls, name, None)
+        if hasattr(obj, "__dict__") and not hasattr(descr, "__set__"):
 
-@dataclass
+            def fn(o, value):
+                o.__dict__[name] = value
+        else:
+
+            def fn(o, value):
+                setattr(o, name, value)
+
+        self._cached_type = cls
+        self._cached_fn = fn
+        fn(obj, v)
+
+
+
+@dataclass(slots=True)
 class Print(Stmt):
     """Representa uma instrução de impressão."""
     expr: Expr
@@ -227,7 +371,7 @@ class Print(Stmt):
         print(lox_str(value))
 
 
-@dataclass
+@dataclass(slots=True)
 class Return(Stmt):
     """Representa uma instrução de retorno."""
     value: Expr | None = None
@@ -241,7 +385,7 @@ class Return(Stmt):
         # Lança a exceção com o valor do retorno
         raise LoxReturn(return_value)
 
-@dataclass
+@dataclass(slots=True)
 class VarDef(Stmt):
     """
     Representa uma declaração de variável.
@@ -251,15 +395,21 @@ class VarDef(Stmt):
     value: Expr | None = None
     type_annotation: str | None = None
 
+    _implicit: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._implicit = bool(is_implicit_int(self.name))
+
     def eval(self, ctx: Ctx):
         val = None
         if self.value is not None:
             val = self.value.eval(ctx)
-        val = auto_convert(self.name, val)
+        if self._implicit:
+            val = coerce_int(val)
         ctx.var_def(self.name, val)
 
 
-@dataclass
+@dataclass(slots=True)
 class If(Stmt):
     """Representa uma instrução condicional."""
     cond: Expr
@@ -267,13 +417,14 @@ class If(Stmt):
     else_branch: Stmt | None = None
 
     def eval(self, ctx:Ctx):
-        if is_truthy(self.cond.eval(ctx)): 
+        value = self.cond.eval(ctx)
+        if value is not None and value is not False:
             return self.then_branch.eval(ctx)
         elif self.else_branch is not None:
             return self.else_branch.eval(ctx)
 
 
-@dataclass
+@dataclass(slots=True)
 class While(Stmt):
     """Representa um laço de repetição."""
     expr: Expr
@@ -281,23 +432,96 @@ class While(Stmt):
 
     def eval(self, ctx: Ctx):
 
-        while is_truthy(self.expr.eval(ctx)):
+        while True:
+            value = self.expr.eval(ctx)
+            if value is None or value is False:
+                break
             self.stmt.eval(ctx)
 
-@dataclass
+@dataclass(slots=True)
+class ForLoop(Stmt):
+    """
+    Laço `for` com inicialização, condição e incremento fundidos.
+
+    Substitui o desaçucaramento clássico em Block + While, que criava um
+    bloco artificial por iteração só para emendar o incremento ao corpo.
+    """
+    init: Stmt | None
+    cond: Expr
+    incr: Expr | None
+    body: Stmt
+
+    def eval(self, ctx: Ctx):
+        init = self.init
+        if init is not None:
+            if isinstance(init, VarDef):
+                # `var` no cabeçalho declara em escopo próprio do laço.
+                ctx = Ctx(scope={}, parent=ctx)
+            init.eval(ctx)
+
+        cond = self.cond
+        body = self.body
+        incr = self.incr
+        if incr is None:
+            while True:
+                value = cond.eval(ctx)
+                if value is None or value is False:
+                    break
+                body.eval(ctx)
+        else:
+            while True:
+                value = cond.eval(ctx)
+                if value is None or value is False:
+                    break
+                body.eval(ctx)
+                incr.eval(ctx)
+
+
+@dataclass(slots=True)
 class Block(Node):
     """Representa bloco de comandos."""
     stmts: list[Stmt]
 
+    # Blocos sem declarações não precisam de escopo próprio: só `var`,
+    # `fun` e `class` inserem nomes, então um bloco sem esses filhos
+    # diretos pode executar direto no contexto que recebeu, sem alocar
+    # um Ctx novo a cada passagem.
+    _needs_scope: bool = field(init=False, repr=False, compare=False)
+
+    # None = ainda não analisado. Um escopo só pode ser reciclado se a
+    # subárvore não declara funções nem classes: são elas que capturam
+    # o dicionário numa clausura que sobrevive ao bloco.
+    _recyclable: bool | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._needs_scope = any(
+            isinstance(stmt, (VarDef, Function, Class)) for stmt in self.stmts
+        )
+
     def eval(self, ctx: Ctx):
 
-        new_ctx = Ctx(scope={}, parent=ctx)
+        if self._needs_scope:
+            recyclable = self._recyclable
+            if recyclable is None:
+                recyclable = self._recyclable = not creates_closure(self)
+            if recyclable:
+                scope = _scope_pool.pop() if _scope_pool else {}
+                ctx = Ctx(scope, ctx)
+                for stmt in self.stmts:
+                    stmt.eval(ctx)
+                # Recicla só na saída limpa: se uma exceção (ou um
+                # `return`) escapar, o dicionário apenas não volta.
+                scope.clear()
+                if len(_scope_pool) < _SCOPE_POOL_MAX:
+                    _scope_pool.append(scope)
+                return
+            ctx = Ctx(scope={}, parent=ctx)
 
         for stmt in self.stmts:
-            stmt.eval(new_ctx)
+            stmt.eval(ctx)
         
 
-@dataclass
+@dataclass(slots=True)
 class Param:
     """Representa um parâmetro de função com tipo opcional."""
     name: str
@@ -311,15 +535,92 @@ class Function(Stmt):
     params: list[Param]
     body: Block
 
+    # Bytecode do corpo (ou None se não compilável); False = ainda não
+    # tentamos compilar. `_pure` segue o mesmo protocolo com None.
+    _chunk = False
+    _pure = None
+
     def eval(self, ctx: Ctx):
         param_names = [p.name if isinstance(p, Param) else p for p in self.params]
 
-        lox_function = LoxFunction(self.name, self.params, self.body, ctx)
-        
+        if self._chunk is False:
+            from .bytecode import compile_function
+
+            self._chunk = compile_function(self)
+        if self._pure is None:
+            self._pure = function_is_pure(self)
+
+        lox_function = LoxFunction(
+            self.name, param_names, self.body, ctx, self._chunk, self._pure
+        )
 
         ctx.var_def(self.name, lox_function)
-        
+
         return None
-@dataclass
+
+
+def function_is_pure(function: Function) -> bool:
+    """
+    Análise conservadora de pureza de uma função.
+
+    Uma função é considerada pura quando o resultado depende apenas dos
+    argumentos: sem `print`, sem atribuições a globais, sem acesso a
+    atributos e com chamadas restritas à recursão direta. Funções puras
+    podem ser memoizadas com segurança (ver `LoxFunction.call`).
+    """
+    stmts = getattr(function.body, "stmts", None)
+    if stmts is None:
+        return False
+
+    local_names = {p.name if isinstance(p, Param) else str(p) for p in function.params}
+    nodes: list[Node] = []
+    for stmt in stmts:
+        if not isinstance(stmt, Node):
+            return False
+        for node in stmt.descendants():
+            nodes.append(node)
+            if isinstance(node, VarDef):
+                local_names.add(node.name)
+
+    # O nome da própria função shadowado por um local tornaria a
+    # chamada recursiva um alvo dinâmico; desistimos nesse caso.
+    if function.name in local_names:
+        return False
+
+    for node in nodes:
+        if isinstance(node, (Literal, BinOp, UnaryOp, And, Or, If, While,
+                             DoWhileStmt, Return, Block, VarDef)):
+            continue
+        if isinstance(node, Var):
+            if node.name not in local_names and node.name != function.name:
+                return False
+        elif isinstance(node, Assign):
+            if node.name not in local_names:
+                return False
+        elif isinstance(node, Call):
+            obj = node.obj
+            if not isinstance(obj, Var) or obj.name != function.name:
+                return False
+        else:
+            return False
+
+    return True
+
+
+def creates_closure(node: Node) -> bool:
+    """
+    Verifica se a subárvore declara funções ou classes.
+
+    Declarações assim capturam o escopo corrente em uma clausura que
+    pode sobreviver ao bloco, então o dicionário de escopo não pode ser
+    reciclado (ver `Block.eval`).
+    """
+    for child in node.descendants():
+        if isinstance(child, (Function, Class)):
+            return True
+    return False
+
+
+@dataclass(slots=True)
 class Class(Stmt):
     """Representa uma classe."""
@@ -0,0 +1,872 @@
+"""
+Compilação da AST para um bytecode linear e a máquina virtual que o executa.
+
+Em vez de avaliar o programa percorrendo a árvore sintática (um método
+`eval` por nó, com uma chamada de função Python por operação), o
+`Compiler` lineariza os comandos em uma lista plana de inteiros
+intercalando opcode e operando. A `VM` executa essa lista em um único
+laço `while`, o que reduz o número de quadros Python e de buscas de
+atributo por operação.
+
+Nós que ainda não possuem regra de compilação são executados pelo
+caminho antigo através dos opcodes `EVAL_EXPR`/`EXEC_STMT`, que apenas
+delegam para `node.eval(ctx)`. Assim a semântica observável é idêntica à
+do interpretador de árvore.
+"""
+
+from dataclasses import dataclass, field
+from enum import IntEnum
+from operator import add, eq, ge, gt, le, lt, mul, ne, neg, not_, sub
+from typing import TYPE_CHECKING
+
+from .ctx import Ctx
+from .runtime import floordiv
+
+if TYPE_CHECKING:
+    from .ast import Node, Value
+
+
+class Op(IntEnum):
+    """Opcodes da máquina virtual."""
+
+    LOAD_CONST = 0
+    LOAD_VAR = 1
+    STORE_VAR = 2
+    VAR_DEF = 3
+    UNOP = 5
+    JUMP = 6
+    JUMP_IF_FALSE = 7
+    JUMP_IF_TRUE = 8
+    JUMP_IF_FALSE_OR_POP = 9
+    JUMP_IF_TRUE_OR_POP = 10
+    CALL = 11
+    POP = 12
+    PRINT = 13
+    PUSH_SCOPE = 14
+    POP_SCOPE = 15
+    RET = 16
+    EVAL_EXPR = 17
+    EXEC_STMT = 18
+    LOAD_LOCAL = 19
+    SET_LOCAL = 20
+    STORE_LOCAL = 21
+    CONVERT_INT = 22
+    ADD = 23
+    SUB = 24
+    MUL = 25
+    DIV = 26
+    ADD_NOCOERCE = 33
+    SUB_NOCOERCE = 34
+    MUL_NOCOERCE = 35
+    DIV_NOCOERCE = 36
+    PRINT_CONST = 37
+    GT = 27
+    LT = 28
+    GE = 29
+    LE = 30
+    EQ = 31
+    NE = 32
+
+
+# Mapeia a identidade do Callable em `BinOp.op` para o opcode
+# especializado correspondente; a VM executa a aritmética inline em vez
+# de despachar por uma função genérica de `operator`.
+BINOP_OPCODES = {
+    add: Op.ADD,
+    sub: Op.SUB,
+    mul: Op.MUL,
+    floordiv: Op.DIV,
+    gt: Op.GT,
+    lt: Op.LT,
+    ge: Op.GE,
+    le: Op.LE,
+    eq: Op.EQ,
+    ne: Op.NE,
+}
+UNOP_TABLE = [neg, not_]
+
+# Variantes das operações aritméticas sem a checagem de coerção
+# float -> int, usadas quando o compilador prova que ela nunca dispara.
+NOCOERCE_OPCODES = {
+    Op.ADD: Op.ADD_NOCOERCE,
+    Op.SUB: Op.SUB_NOCOERCE,
+    Op.MUL: Op.MUL_NOCOERCE,
+    Op.DIV: Op.DIV_NOCOERCE,
+}
+
+COMPARISON_OPS = frozenset({gt, lt, ge, le, eq, ne})
+
+
+def fold(node):
+    """
+    Dobra constantes de baixo para cima em subárvores de `BinOp`.
+
+    Operações entre literais numéricos são computadas uma única vez na
+    compilação (aplicando aqui a mesma regra de coerção float -> int do
+    avaliador) e viram um `Literal` pronto. Subárvores não constantes
+    são devolvidas como estão.
+    """
+    from .ast import BinOp, Literal
+
+    if not isinstance(node, BinOp) or node.op not in BINOP_OPCODES:
+        return node
+
+    left = fold(node.left)
+    right = fold(node.right)
+    if isinstance(left, Literal) and isinstance(right, Literal):
+        a, b = left.value, right.value
+        if (
+            type(a) in (int, float)
+            and type(b) in (int, float)
+            and (result := _try_apply(node.op, a, b)) is not NotImplemented
+        ):
+            if isinstance(a, float) and a.is_integer() and \
+               isinstance(b, float) and b.is_integer() and \
+               isinstance(result, float):
+                result = int(result)
+            return Literal(result)
+
+    if left is not node.left or right is not node.right:
+        return BinOp(left, right, node.op)
+    return node
+
+
+def _try_apply(op_fn, a, b):
+    # Erros (ex.: divisão por zero) devem continuar acontecendo em
+    # tempo de execução, então desistimos de dobrar nesses casos.
+    try:
+        return op_fn(a, b)
+    except Exception:
+        return NotImplemented
+
+
+def never_float(node) -> bool:
+    """
+    Verifica estaticamente que a expressão nunca produz float.
+    """
+    from .ast import And, BinOp, Literal, Or, UnaryOp
+
+    if isinstance(node, Literal):
+        return not isinstance(node.value, float)
+    if isinstance(node, BinOp):
+        return node.op in COMPARISON_OPS
+    if isinstance(node, UnaryOp):
+        return node.op is not_
+    if isinstance(node, (And, Or)):
+        return never_float(node.left) and never_float(node.right)
+    return False
+
+
+def pure_key(node, cache: dict):
+    """
+    Chave estrutural de uma expressão pura, ou None.
+
+    Expressões compostas apenas por literais, variáveis e operadores sem
+    efeito colateral recebem uma chave hashável que identifica
+    subárvores estruturalmente idênticas — duas ocorrências de `a * b`
+    produzem a mesma chave. Qualquer outra construção (chamadas,
+    atribuições, curto-circuito...) devolve None. O resultado é
+    memoizado por identidade de nó em `cache`, então cada nó é
+    analisado uma única vez por compilação.
+    """
+    from .ast import BinOp, Literal, UnaryOp, Var
+
+    node_id = id(node)
+    try:
+        return cache[node_id]
+    except KeyError:
+        pass
+
+    if isinstance(node, Literal):
+        key = ("lit", type(node.value), node.value)
+    elif isinstance(node, Var):
+        key = ("var", node.name)
+    elif isinstance(node, BinOp) and node.op in BINOP_OPCODES:
+        left = pure_key(node.left, cache)
+        right = pure_key(node.right, cache)
+        if left is None or right is None:
+            key = None
+        else:
+            key = ("bin", node.op, left, right)
+    elif isinstance(node, UnaryOp) and node.op in UNOP_TABLE:
+        value = pure_key(node.value, cache)
+        key = None if value is None else ("un", node.op, value)
+    else:
+        key = None
+
+    cache[node_id] = key
+    return key
+
+
+@dataclass
+class Chunk:
+    """
+    Resultado da compilação: código linear e as tabelas de apoio.
+
+    `code` intercala opcode e operando: `code[2i]` é o opcode e
+    `code[2i + 1]` o operando (zero quando não é usado).
+    """
+
+    code: list[int] = field(default_factory=list)
+    consts: list["Value"] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+
+
+@dataclass
+class FunctionChunk(Chunk):
+    """
+    Bytecode de um corpo de função com variáveis resolvidas para slots.
+    """
+
+    num_locals: int = 0
+
+
+class Unsupported(Exception):
+    """
+    Sinaliza que um nó não pode ser compilado e o caminho de árvore deve
+    ser usado no lugar.
+    """
+
+
+class Compiler:
+    """
+    Converte nós da AST em um `Chunk` de bytecode.
+
+    O despacho é feito pelo nome da classe do nó: um método
+    `stmt_<Classe>` ou `expr_<Classe>` quando existe regra específica,
+    com `EVAL_EXPR`/`EXEC_STMT` como fallback genérico.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk()
+        self._name_index: dict[str, int] = {}
+
+    # Utilitários de emissão -------------------------------------------------
+
+    def emit(self, op: Op, arg: int = 0) -> None:
+        self.chunk.code.append(op)
+        self.chunk.code.append(arg)
+
+    def emit_jump(self, op: Op) -> int:
+        """Emite um salto com alvo pendente e retorna a posição a corrigir."""
+        self.emit(op, -1)
+        return len(self.chunk.code) - 1
+
+    def patch_jump(self, pos: int) -> None:
+        """Aponta o salto pendente em `pos` para a próxima instrução."""
+        self.chunk.code[pos] = len(self.chunk.code)
+
+    def add_const(self, value) -> int:
+        self.chunk.consts.append(value)
+        return len(self.chunk.consts) - 1
+
+    def add_name(self, name: str) -> int:
+        try:
+            return self._name_index[name]
+        except KeyError:
+            index = self._name_index[name] = len(self.chunk.names)
+            self.chunk.names.append(name)
+            return index
+
+    # Despacho ---------------------------------------------------------------
+
+    def stmt(self, node: "Node") -> None:
+        from .ast import Expr
+
+        method = getattr(self, "stmt_" + type(node).__name__, None)
+        if method is not None:
+            method(node)
+        elif isinstance(node, Expr):
+            # Expressão usada como comando: avalia e descarta o valor.
+            self.expr(node)
+            self.emit(Op.POP)
+        else:
+            self.fallback_stmt(node)
+
+    def expr(self, node: "Node") -> None:
+        method = getattr(self, "expr_" + type(node).__name__, None)
+        if method is not None:
+            method(node)
+        else:
+            self.fallback_expr(node)
+
+    def fallback_stmt(self, node: "Node") -> None:
+        self.emit(Op.EXEC_STMT, self.add_const(node))
+
+    def fallback_expr(self, node: "Node") -> None:
+        self.emit(Op.EVAL_EXPR, self.add_const(node))
+
+    # Comandos ---------------------------------------------------------------
+
+    def stmt_Print(self, node) -> None:
+        from .ast import Literal, lox_str
+
+        # `print` de constante: a string final é formatada uma única vez
+        # na compilação e o handler só faz `print(consts[arg])`.
+        expr = fold(node.expr)
+        if isinstance(expr, Literal):
+            self.emit(Op.PRINT_CONST, self.add_const(lox_str(expr.value)))
+            return
+        self.expr(expr)
+        self.emit(Op.PRINT)
+
+    def stmt_VarDef(self, node) -> None:
+        if node.value is None:
+            self.emit(Op.LOAD_CONST, self.add_const(None))
+        else:
+            self.expr(node.value)
+        if node._implicit:
+            self.emit(Op.CONVERT_INT)
+        self.emit(Op.VAR_DEF, self.add_name(node.name))
+
+    def stmt_If(self, node) -> None:
+        self.expr(node.cond)
+        to_else = self.emit_jump(Op.JUMP_IF_FALSE)
+        self.stmt(node.then_branch)
+        if node.else_branch is None:
+            self.patch_jump(to_else)
+        else:
+            to_end = self.emit_jump(Op.JUMP)
+            self.patch_jump(to_else)
+            self.stmt(node.else_branch)
+            self.patch_jump(to_end)
+
+    def stmt_While(self, node) -> None:
+        start = len(self.chunk.code)
+        self.expr(node.expr)
+        to_end = self.emit_jump(Op.JUMP_IF_FALSE)
+        self.stmt(node.stmt)
+        self.emit(Op.JUMP, start)
+        self.patch_jump(to_end)
+
+    def stmt_DoWhileStmt(self, node) -> None:
+        start = len(self.chunk.code)
+        self.stmt(node.body)
+        self.expr(node.condition)
+        self.emit(Op.JUMP_IF_TRUE, start)
+
+    def stmt_ForLoop(self, node) -> None:
+        from .ast import VarDef
+
+        scoped = isinstance(node.init, VarDef)
+        if scoped:
+            self.emit(Op.PUSH_SCOPE)
+        if node.init is not None:
+            self.stmt(node.init)
+        self._for_loop(node)
+        if scoped:
+            self.emit(Op.POP_SCOPE)
+
+    def _for_loop(self, node) -> None:
+        """Emite o laço do `for` (condição, corpo e incremento)."""
+        start = len(self.chunk.code)
+        self.expr(node.cond)
+        to_end = self.emit_jump(Op.JUMP_IF_FALSE)
+        self.stmt(node.body)
+        if node.incr is not None:
+            self.expr(node.incr)
+            self.emit(Op.POP)
+        self.emit(Op.JUMP, start)
+        self.patch_jump(to_end)
+
+    def stmt_Block(self, node) -> None:
+        # Blocos sem declarações executam direto no escopo corrente
+        # (ver `Block._needs_scope` em lox.ast).
+        if not node._needs_scope:
+            for stmt in node.stmts:
+                self.stmt(stmt)
+            return
+        self.emit(Op.PUSH_SCOPE)
+        for stmt in node.stmts:
+            self.stmt(stmt)
+        self.emit(Op.POP_SCOPE)
+
+    # Expressões -------------------------------------------------------------
+
+    def expr_Literal(self, node) -> None:
+        self.emit(Op.LOAD_CONST, self.add_const(node.value))
+
+    def expr_Var(self, node) -> None:
+        self.emit(Op.LOAD_VAR, self.add_name(node.name))
+
+    def expr_Assign(self, node) -> None:
+        self.expr(node.value)
+        if node._implicit:
+            self.emit(Op.CONVERT_INT)
+        self.emit(Op.STORE_VAR, self.add_name(node.name))
+
+    def expr_BinOp(self, node) -> None:
+        from .ast import Literal
+
+        folded = fold(node)
+        if isinstance(folded, Literal):
+            self.expr_Literal(folded)
+            return
+        node = folded
+
+        opcode = BINOP_OPCODES.get(node.op)
+        if opcode is None:
+            self.fallback_expr(node)
+            return
+        self.expr(node.left)
+        self.expr(node.right)
+        # A coerção float -> int só dispara com os dois operandos
+        # float; se algum deles comprovadamente nunca é float, usamos a
+        # variante sem checagem.
+        if opcode in NOCOERCE_OPCODES and \
+                (never_float(node.left) or never_float(node.right)):
+            opcode = NOCOERCE_OPCODES[opcode]
+        self.emit(opcode)
+
+    def expr_UnaryOp(self, node) -> None:
+        try:
+            index = UNOP_TABLE.index(node.op)
+        except ValueError:
+            self.fallback_expr(node)
+            return
+        self.expr(node.value)
+        self.emit(Op.UNOP, index)
+
+    def expr_And(self, node) -> None:
+        self.expr(node.left)
+        to_end = self.emit_jump(Op.JUMP_IF_FALSE_OR_POP)
+        self.expr(node.right)
+        self.patch_jump(to_end)
+
+    def expr_Or(self, node) -> None:
+        self.expr(node.left)
+        to_end = self.emit_jump(Op.JUMP_IF_TRUE_OR_POP)
+        self.expr(node.right)
+        self.patch_jump(to_end)
+
+    def expr_Call(self, node) -> None:
+        self.expr(node.obj)
+        for param in node.params:
+            self.expr(param)
+        self.emit(Op.CALL, self.add_const((len(node.params), node.obj)))
+
+
+class FunctionCompiler(Compiler):
+    """
+    Compila corpos de função resolvendo variáveis locais para slots.
+
+    Parâmetros e declarações `var` viram índices em um vetor de locais
+    (`frame`), de modo que ler ou escrever uma variável local custa uma
+    indexação de lista em vez de percorrer a cadeia de `Ctx` fazendo
+    buscas em dicionários. Nomes não resolvidos (globais e variáveis da
+    clausura) continuam passando por `LOAD_VAR`/`STORE_VAR`.
+
+    A compilação é tudo-ou-nada: se o corpo contém algum nó sem regra
+    própria (funções aninhadas, classes, acesso a atributos...),
+    levantamos `Unsupported` e a função inteira volta ao interpretador
+    de árvore. Isso evita que um fallback `EVAL_EXPR` precise enxergar
+    locais que só existem no vetor de slots.
+    """
+
+    def __init__(self, params: list[str]):
+        super().__init__()
+        if len(set(params)) != len(params):
+            # Parâmetros duplicados: o caminho de árvore reporta o erro
+            # de redeclaração em tempo de execução.
+            raise Unsupported("parâmetros duplicados")
+        self.scopes: list[dict[str, int]] = [
+            {name: slot for slot, name in enumerate(params)}
+        ]
+        self.num_locals = len(params)
+        # Memoização da análise de pureza e mapa de subexpressões
+        # repetidas da expressão em compilação (ver `expr`).
+        self._key_cache: dict[int, object] = {}
+        self._cse: dict | None = None
+
+    def resolve(self, name: str) -> int | None:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def declare(self, name: str) -> int:
+        scope = self.scopes[-1]
+        if name in scope:
+            # Redeclaração no mesmo escopo: deixa o caminho de árvore
+            # reportar o erro em tempo de execução.
+            raise Unsupported(name)
+        slot = scope[name] = self.num_locals
+        self.num_locals += 1
+        return slot
+
+    def fallback_stmt(self, node: "Node") -> None:
+        raise Unsupported(type(node).__name__)
+
+    def fallback_expr(self, node: "Node") -> None:
+        raise Unsupported(type(node).__name__)
+
+    def expr(self, node) -> None:
+        cse = self._cse
+        if cse is None:
+            # Em uma expressão inteiramente pura, subárvores repetidas
+            # podem ser avaliadas uma única vez e guardadas em um slot
+            # temporário (eliminação de subexpressão comum).
+            if pure_key(node, self._key_cache) is not None:
+                dups = self._collect_dups(node)
+                if dups is not None:
+                    self._cse = dups
+                    try:
+                        self.expr(node)
+                    finally:
+                        self._cse = None
+                    return
+            super().expr(node)
+            return
+
+        key = pure_key(node, self._key_cache)
+        if key is not None and key in cse:
+            slot = cse[key]
+            if slot is not None:
+                self.emit(Op.LOAD_LOCAL, slot)
+                return
+            super().expr(node)
+            # SET_LOCAL mantém o valor no topo da pilha: a primeira
+            # ocorrência computa e as demais só leem o slot.
+            slot = cse[key] = self.num_locals
+            self.num_locals += 1
+            self.emit(Op.SET_LOCAL, slot)
+            return
+        super().expr(node)
+
+    def _collect_dups(self, node) -> dict | None:
+        """
+        Conta subárvores compostas repetidas em uma expressão pura.
+
+        Retorna um mapa chave -> slot (inicialmente None) com as chaves
+        que aparecem mais de uma vez, ou None se não houver repetição.
+        """
+        from .ast import BinOp, UnaryOp
+
+        counts: dict = {}
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            if isinstance(current, BinOp):
+                key = pure_key(current, self._key_cache)
+                counts[key] = counts.get(key, 0) + 1
+                pending.append(current.left)
+                pending.append(current.right)
+            elif isinstance(current, UnaryOp):
+                key = pure_key(current, self._key_cache)
+                counts[key] = counts.get(key, 0) + 1
+                pending.append(current.value)
+
+        dups = {key: None for key, count in counts.items() if count >= 2}
+        return dups or None
+
+    def stmt_VarDef(self, node) -> None:
+        if node.value is None:
+            self.emit(Op.LOAD_CONST, self.add_const(None))
+        else:
+            self.expr(node.value)
+        if node._implicit:
+            self.emit(Op.CONVERT_INT)
+        # Declara só depois de compilar o valor: em `var x = x + 1;` o
+        # `x` do lado direito resolve para o escopo externo.
+        self.emit(Op.STORE_LOCAL, self.declare(node.name))
+
+    def stmt_Block(self, node) -> None:
+        self.scopes.append({})
+        for stmt in node.stmts:
+            self.stmt(stmt)
+        self.scopes.pop()
+
+    def stmt_ForLoop(self, node) -> None:
+        # O `var` do cabeçalho vira um slot no escopo do laço.
+        self.scopes.append({})
+        if node.init is not None:
+            self.stmt(node.init)
+        self._for_loop(node)
+        self.scopes.pop()
+
+    def stmt_Return(self, node) -> None:
+        if node.value is None:
+            self.emit(Op.LOAD_CONST, self.add_const(None))
+        else:
+            self.expr(node.value)
+        self.emit(Op.RET)
+
+    def expr_Var(self, node) -> None:
+        slot = self.resolve(node.name)
+        if slot is None:
+            super().expr_Var(node)
+        else:
+            self.emit(Op.LOAD_LOCAL, slot)
+
+    def expr_Assign(self, node) -> None:
+        slot = self.resolve(node.name)
+        if slot is None:
+            super().expr_Assign(node)
+            return
+        self.expr(node.value)
+        if node._implicit:
+            self.emit(Op.CONVERT_INT)
+        self.emit(Op.SET_LOCAL, slot)
+
+
+class VM:
+    """
+    Laço de despacho que executa um `Chunk`.
+    """
+
+    def run(self, chunk: Chunk, ctx: Ctx, frame: list | None = None) -> "Value":
+        from .ast import coerce_int, lox_str
+
+        code = chunk.code
+        consts = chunk.consts
+        names = chunk.names
+        stack: list["Value"] = []
+        pc = 0
+
+        # Versão em Python puro do que um backend compilado faria de
+        # graça: todo nome usado no laço de despacho vira uma variável
+        # local (LOAD_FAST), eliminando o LOAD_GLOBAL + LOAD_ATTR de
+        # `Op.X`, `stack.append` e `stack.pop` em cada instrução.
+        push = stack.append
+        pop = stack.pop
+        LOAD_CONST = Op.LOAD_CONST
+        LOAD_VAR = Op.LOAD_VAR
+        STORE_VAR = Op.STORE_VAR
+        VAR_DEF = Op.VAR_DEF
+        ADD = Op.ADD
+        SUB = Op.SUB
+        MUL = Op.MUL
+        DIV = Op.DIV
+        ADD_NOCOERCE = Op.ADD_NOCOERCE
+        SUB_NOCOERCE = Op.SUB_NOCOERCE
+        MUL_NOCOERCE = Op.MUL_NOCOERCE
+        DIV_NOCOERCE = Op.DIV_NOCOERCE
+        GT = Op.GT
+        LT = Op.LT
+        GE = Op.GE
+        LE = Op.LE
+        EQ = Op.EQ
+        NE = Op.NE
+        UNOP = Op.UNOP
+        JUMP = Op.JUMP
+        JUMP_IF_FALSE = Op.JUMP_IF_FALSE
+        JUMP_IF_TRUE = Op.JUMP_IF_TRUE
+        JUMP_IF_FALSE_OR_POP = Op.JUMP_IF_FALSE_OR_POP
+        JUMP_IF_TRUE_OR_POP = Op.JUMP_IF_TRUE_OR_POP
+        CALL = Op.CALL
+        POP = Op.POP
+        PRINT = Op.PRINT
+        PRINT_CONST = Op.PRINT_CONST
+        PUSH_SCOPE = Op.PUSH_SCOPE
+        POP_SCOPE = Op.POP_SCOPE
+        RET = Op.RET
+        EVAL_EXPR = Op.EVAL_EXPR
+        EXEC_STMT = Op.EXEC_STMT
+        LOAD_LOCAL = Op.LOAD_LOCAL
+        SET_LOCAL = Op.SET_LOCAL
+        STORE_LOCAL = Op.STORE_LOCAL
+        CONVERT_INT = Op.CONVERT_INT
+
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+
+            if op == LOAD_CONST:
+                push(consts[arg])
+            elif op == LOAD_VAR:
+                name = names[arg]
+                try:
+                    push(ctx[name])
+                except KeyError:
+                    raise NameError(f"variável {name} não existe!")
+            elif op == STORE_VAR:
+                ctx[names[arg]] = stack[-1]
+            elif op == VAR_DEF:
+                ctx.var_def(names[arg], pop())
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                result = left + right
+                if isinstance(left, float) and left.is_integer() and \
+                   isinstance(right, float) and right.is_integer() and \
+                   isinstance(result, float):
+                    result = int(result)
+                stack[-1] = result
+            elif op == SUB:
+                right = pop()
+                left = stack[-1]
+                result = left - right
+                if isinstance(left, float) and left.is_integer() and \
+                   isinstance(right, float) and right.is_integer() and \
+                   isinstance(result, float):
+                    result = int(result)
+                stack[-1] = result
+            elif op == MUL:
+                right = pop()
+                left = stack[-1]
+                result = left * right
+                if isinstance(left, float) and left.is_integer() and \
+                   isinstance(right, float) and right.is_integer() and \
+                   isinstance(result, float):
+                    result = int(result)
+                stack[-1] = result
+            elif op == DIV:
+                right = pop()
+                left = stack[-1]
+                result = left // right
+                if isinstance(left, float) and left.is_integer() and \
+                   isinstance(right, float) and right.is_integer() and \
+                   isinstance(result, float):
+                    result = int(result)
+                stack[-1] = result
+            elif op == ADD_NOCOERCE:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == SUB_NOCOERCE:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == MUL_NOCOERCE:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == DIV_NOCOERCE:
+                right = pop()
+                stack[-1] = stack[-1] // right
+            # Comparações devolvem bool, então dispensam a correção
+            # float -> int aplicada às operações aritméticas.
+            elif op == GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif op == LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif op == GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif op == LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif op == EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == NE:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif op == UNOP:
+                stack[-1] = UNOP_TABLE[arg](stack[-1])
+            elif op == JUMP:
+                pc = arg
+            # Veracidade inline (só nil e false são falsos): nenhuma
+            # chamada de função por decisão de salto.
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    pc = arg
+            elif op == JUMP_IF_TRUE:
+                value = pop()
+                if value is not None and value is not False:
+                    pc = arg
+            elif op == JUMP_IF_FALSE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    pc = arg
+                else:
+                    pop()
+            elif op == JUMP_IF_TRUE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    pop()
+                else:
+                    pc = arg
+            elif op == CALL:
+                argc, obj_node = consts[arg]
+                args = stack[len(stack) - argc:]
+                del stack[len(stack) - argc:]
+                obj = pop()
+                if callable(obj):
+                    push(obj(*args))
+                else:
+                    raise TypeError(f"{obj_node} não é uma função!")
+            elif op == POP:
+                pop()
+            elif op == PRINT:
+                print(lox_str(pop()))
+            elif op == PRINT_CONST:
+                # String já formatada na compilação; `print` resolve
+                # sys.stdout na hora, então redirecionamentos funcionam.
+                print(consts[arg])
+            elif op == PUSH_SCOPE:
+                ctx = Ctx(scope={}, parent=ctx)
+            elif op == POP_SCOPE:
+                ctx = ctx.parent
+            elif op == RET:
+                return pop()
+            elif op == EVAL_EXPR:
+                push(consts[arg].eval(ctx))
+            elif op == EXEC_STMT:
+                consts[arg].eval(ctx)
+            elif op == LOAD_LOCAL:
+                push(frame[arg])
+            elif op == SET_LOCAL:
+                frame[arg] = stack[-1]
+            elif op == STORE_LOCAL:
+                frame[arg] = pop()
+            elif op == CONVERT_INT:
+                stack[-1] = coerce_int(stack[-1])
+            else:
+                raise RuntimeError(f"opcode inválido: {op}")
+
+
+def compile_program(program) -> Chunk:
+    """
+    Compila um `Program` em um `Chunk` executável pela VM.
+    """
+    compiler = Compiler()
+    for stmt in program.stmts:
+        compiler.stmt(stmt)
+    compiler.emit(Op.LOAD_CONST, compiler.add_const(None))
+    compiler.emit(Op.RET)
+    return compiler.chunk
+
+
+def compile_function(function) -> FunctionChunk | None:
+    """
+    Compila o corpo de um `Function` com locais resolvidos para slots.
+
+    Retorna `None` quando o corpo usa alguma construção sem regra de
+    compilação; nesse caso a função deve ser avaliada pelo caminho de
+    árvore.
+    """
+    from .ast import Param
+
+    params = [p.name if isinstance(p, Param) else p for p in function.params]
+    stmts = getattr(function.body, "stmts", None)
+    if stmts is None:
+        return None
+
+    try:
+        compiler = FunctionCompiler(params)
+        for stmt in stmts:
+            compiler.stmt(stmt)
+    except Unsupported:
+        return None
+
+    # Retorno implícito de nil no fim do corpo.
+    compiler.emit(Op.LOAD_CONST, compiler.add_const(None))
+    compiler.emit(Op.RET)
+
+    chunk = compiler.chunk
+    return FunctionChunk(chunk.code, chunk.consts, chunk.names, compiler.num_locals)
+
+
+def run_program(program, ctx: Ctx) -> "Value":
+    """
+    Executa um `Program`, compilando-o na primeira avaliação.
+
+    O `Chunk` é guardado no próprio nó, de modo que reavaliar o mesmo
+    programa (por exemplo em um laço do REPL) não recompila nada.
+    """
+    chunk = program._chunk
+    if chunk is None:
+        chunk = program._chunk = compile_program(program)
+    return VM().run(chunk, ctx)
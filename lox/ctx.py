@@ -42,6 +42,14 @@ class Ctx:
     scope: ScopeDict = field(default_factory=dict)
     parent: Optional["Ctx"] = field(default_factory=lambda: Ctx(BUILTINS, None))
 
+    # Contador global de definições: a única forma de um escopo ganhar
+    # um nome novo é via `var_def`, então caches de resolução (ver
+    # `Var._cell` em lox.ast) podem ser validados comparando este valor.
+    # Ele também avança quando uma ligação que guarda uma função é
+    # sobrescrita, pois isso pode trocar o alvo de recursão de uma
+    # função pura memoizada (ver `LoxFunction.call`).
+    _defs_version = 0
+
     @classmethod
     def from_dict(cls, env: ScopeDict) -> "Ctx":
         """
@@ -68,6 +76,8 @@ class Ctx:
         Define o valor de uma variável pelo nome.
         """
         if name in self.scope:
+            if callable(self.scope[name]):
+                Ctx._defs_version += 1
             self.scope[name] = value
         elif self.parent is not None:
             self.parent[name] = value
@@ -95,8 +105,20 @@ class Ctx:
         """
         if name in self.scope and not self.is_global():
             raise KeyError(f"Variable '{name}' already defined in the current scope.")
+        Ctx._defs_version += 1
         self.scope[name] = value
 
+    def find_scope(self, name: str) -> ScopeDict | None:
+        """
+        Retorna o escopo mais interno que contém a variável, ou None.
+        """
+        this = self
+        while this is not None:
+            if name in this.scope:
+                return this.scope
+            this = this.parent
+        return None
+
     def to_dict(self) -> ScopeDict:
         """
         Converte o contexto para um dicionário.
@@ -0,0 +1,344 @@
+"""
+Tradução de corpos de função quentes para código Python.
+
+Depois que o corpo de uma função foi compilado para bytecode, o degrau
+seguinte é gerar uma função Python equivalente e deixar o próprio
+CPython executá-la: variáveis locais do Lox viram locais do Python e o
+laço de despacho da VM desaparece por completo.
+
+A geração só é tentada depois de `JIT_THRESHOLD` chamadas (ver
+`lox.runtime`), então programas curtos não pagam nada. O
+subconjunto aceito é o mesmo do `FunctionCompiler`: qualquer construção
+fora dele levanta `Unsupported` e a função continua na VM de bytecode.
+"""
+
+from typing import Callable
+
+from .bytecode import BINOP_OPCODES, COMPARISON_OPS, Unsupported, never_float
+from .ctx import Ctx
+
+# Operadores aritméticos/relacionais inline, indexados pela identidade
+# do Callable em `BinOp.op` (mesma tabela de despacho do bytecode).
+_INFIX_SYMBOL = {
+    "add": "+",
+    "sub": "-",
+    "mul": "*",
+    "floordiv": "//",
+    "gt": ">",
+    "lt": "<",
+    "ge": ">=",
+    "le": "<=",
+    "eq": "==",
+    "ne": "!=",
+}
+
+
+def _load(ctx: Ctx, name: str):
+    try:
+        return ctx[name]
+    except KeyError:
+        raise NameError(f"variável {name} não existe!")
+
+
+def _store(ctx: Ctx, name: str, value):
+    ctx[name] = value
+    return value
+
+
+def _call(fn, obj_node, *args):
+    if callable(fn):
+        return fn(*args)
+    raise TypeError(f"{obj_node} não é uma função!")
+
+
+def _print(value) -> None:
+    from .ast import lox_str
+
+    print(lox_str(value))
+
+
+def _coerced(symbol: str) -> Callable:
+    # Fábrica das operações aritméticas com a regra de coerção
+    # float -> int do avaliador (os dois operandos float integrais e o
+    # resultado float).
+    src = (
+        "def op(left, right):\n"
+        f"    result = left {symbol} right\n"
+        "    if isinstance(left, float) and left.is_integer() and \\\n"
+        "       isinstance(right, float) and right.is_integer() and \\\n"
+        "       isinstance(result, float):\n"
+        "        return int(result)\n"
+        "    return result\n"
+    )
+    namespace: dict = {}
+    exec(src, namespace)
+    return namespace["op"]
+
+
+_GLOBALS_BASE = {
+    "__load": _load,
+    "__store": _store,
+    "__call": _call,
+    "__print": _print,
+    "__add": _coerced("+"),
+    "__sub": _coerced("-"),
+    "__mul": _coerced("*"),
+    "__div": _coerced("//"),
+}
+
+
+class JitCompiler:
+    """
+    Gera o código-fonte Python equivalente a um corpo de função.
+
+    Locais resolvem para nomes `_lN` (mesma disciplina de escopos do
+    `FunctionCompiler`); nomes não resolvidos leem e escrevem na
+    clausura via `__load`/`__store`. Nós sem regra levantam
+    `Unsupported`.
+    """
+
+    def __init__(self, params: list[str]):
+        self.scopes: list[dict[str, int]] = [
+            {name: slot for slot, name in enumerate(params)}
+        ]
+        self.num_locals = len(params)
+        self.lines: list[str] = []
+        self.nodes: list = []
+        self._temps = 0
+
+    # Utilitários -------------------------------------------------------------
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def temp(self) -> str:
+        name = f"_t{self._temps}"
+        self._temps += 1
+        return name
+
+    def add_node(self, node) -> str:
+        self.nodes.append(node)
+        return f"__nodes[{len(self.nodes) - 1}]"
+
+    def resolve(self, name: str) -> int | None:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def declare(self, name: str) -> int:
+        scope = self.scopes[-1]
+        if name in scope:
+            raise Unsupported(name)
+        slot = scope[name] = self.num_locals
+        self.num_locals += 1
+        return slot
+
+    # Despacho ----------------------------------------------------------------
+
+    def stmt(self, node, indent: int) -> None:
+        from .ast import Expr
+
+        method = getattr(self, "stmt_" + type(node).__name__, None)
+        if method is not None:
+            method(node, indent)
+        elif isinstance(node, Expr):
+            self.emit(indent, self.expr(node))
+        else:
+            raise Unsupported(type(node).__name__)
+
+    def expr(self, node) -> str:
+        method = getattr(self, "expr_" + type(node).__name__, None)
+        if method is None:
+            raise Unsupported(type(node).__name__)
+        return method(node)
+
+    # Comandos ----------------------------------------------------------------
+
+    def stmt_Print(self, node, indent: int) -> None:
+        from .ast import Literal, lox_str
+
+        from .bytecode import fold
+
+        expr = fold(node.expr)
+        if isinstance(expr, Literal):
+            self.emit(indent, f"print({lox_str(expr.value)!r})")
+        else:
+            self.emit(indent, f"__print({self.expr(expr)})")
+
+    def stmt_VarDef(self, node, indent: int) -> None:
+        if node.value is None:
+            value = "None"
+        else:
+            value = self.expr(node.value)
+        if node._implicit:
+            value = f"__ci({value})"
+        # Declara só depois de gerar o valor: em `var x = x + 1;` o `x`
+        # do lado direito resolve para o escopo externo.
+        self.emit(indent, f"_l{self.declare(node.name)} = {value}")
+
+    def stmt_If(self, node, indent: int) -> None:
+        cond = self.temp()
+        self.emit(indent, f"{cond} = {self.expr(node.cond)}")
+        self.emit(indent, f"if {cond} is not None and {cond} is not False:")
+        self.stmt(node.then_branch, indent + 1)
+        if node.else_branch is not None:
+            self.emit(indent, "else:")
+            self.stmt(node.else_branch, indent + 1)
+
+    def stmt_While(self, node, indent: int) -> None:
+        cond = self.temp()
+        self.emit(indent, "while True:")
+        self.emit(indent + 1, f"{cond} = {self.expr(node.expr)}")
+        self.emit(indent + 1, f"if {cond} is None or {cond} is False:")
+        self.emit(indent + 2, "break")
+        self.stmt(node.stmt, indent + 1)
+
+    def stmt_DoWhileStmt(self, node, indent: int) -> None:
+        cond = self.temp()
+        self.emit(indent, "while True:")
+        self.stmt(node.body, indent + 1)
+        self.emit(indent + 1, f"{cond} = {self.expr(node.condition)}")
+        self.emit(indent + 1, f"if {cond} is None or {cond} is False:")
+        self.emit(indent + 2, "break")
+
+    def stmt_ForLoop(self, node, indent: int) -> None:
+        self.scopes.append({})
+        if node.init is not None:
+            self.stmt(node.init, indent)
+        cond = self.temp()
+        self.emit(indent, "while True:")
+        self.emit(indent + 1, f"{cond} = {self.expr(node.cond)}")
+        self.emit(indent + 1, f"if {cond} is None or {cond} is False:")
+        self.emit(indent + 2, "break")
+        self.stmt(node.body, indent + 1)
+        if node.incr is not None:
+            self.emit(indent + 1, self.expr(node.incr))
+        self.scopes.pop()
+
+    def stmt_Block(self, node, indent: int) -> None:
+        if not node.stmts:
+            self.emit(indent, "pass")
+            return
+        self.scopes.append({})
+        for stmt in node.stmts:
+            self.stmt(stmt, indent)
+        self.scopes.pop()
+
+    def stmt_Return(self, node, indent: int) -> None:
+        if node.value is None:
+            self.emit(indent, "return None")
+        else:
+            self.emit(indent, f"return {self.expr(node.value)}")
+
+    # Expressões --------------------------------------------------------------
+
+    def expr_Literal(self, node) -> str:
+        return repr(node.value)
+
+    def expr_Var(self, node) -> str:
+        slot = self.resolve(node.name)
+        if slot is None:
+            return f"__load(__closure, {node.name!r})"
+        return f"_l{slot}"
+
+    def expr_Assign(self, node) -> str:
+        value = self.expr(node.value)
+        if node._implicit:
+            value = f"__ci({value})"
+        slot = self.resolve(node.name)
+        if slot is None:
+            return f"__store(__closure, {node.name!r}, {value})"
+        return f"(_l{slot} := {value})"
+
+    def expr_BinOp(self, node) -> str:
+        from .ast import Literal
+
+        from .bytecode import fold
+
+        folded = fold(node)
+        if isinstance(folded, Literal):
+            return self.expr_Literal(folded)
+        node = folded
+
+        if node.op not in BINOP_OPCODES:
+            raise Unsupported(node.op)
+        symbol = _INFIX_SYMBOL[node.op.__name__]
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        if node.op in COMPARISON_OPS or \
+                never_float(node.left) or never_float(node.right):
+            return f"({left} {symbol} {right})"
+        # Aritmética que pode disparar a coerção float -> int passa
+        # pelos helpers que replicam a regra do avaliador.
+        helper = {"+": "__add", "-": "__sub", "*": "__mul", "//": "__div"}
+        return f"{helper[symbol]}({left}, {right})"
+
+    def expr_UnaryOp(self, node) -> str:
+        from operator import neg, not_
+
+        if node.op is neg:
+            return f"(- {self.expr(node.value)})"
+        if node.op is not_:
+            return f"(not {self.expr(node.value)})"
+        raise Unsupported(node.op)
+
+    def expr_And(self, node) -> str:
+        temp = self.temp()
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        # O walrus fica na condição (avaliada primeiro); o lado direito
+        # só é avaliado quando o esquerdo é verdadeiro.
+        return (
+            f"({right} if ({temp} := {left}) is not None "
+            f"and {temp} is not False else {temp})"
+        )
+
+    def expr_Or(self, node) -> str:
+        temp = self.temp()
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        return (
+            f"({temp} if ({temp} := {left}) is not None "
+            f"and {temp} is not False else {right})"
+        )
+
+    def expr_Call(self, node) -> str:
+        obj = self.expr(node.obj)
+        args = "".join(f", {self.expr(param)}" for param in node.params)
+        return f"__call({obj}, {self.add_node(node.obj)}{args})"
+
+
+def compile_jit(function) -> Callable | None:
+    """
+    Gera uma função Python para o corpo de `function` (um `LoxFunction`).
+
+    Retorna `None` quando o corpo usa alguma construção fora do
+    subconjunto suportado; a função continua então na VM de bytecode.
+    """
+    from .ast import coerce_int
+
+    params = [getattr(p, "name", p) for p in function.params]
+    stmts = getattr(function.body, "stmts", None)
+    if stmts is None:
+        return None
+
+    compiler = JitCompiler(params)
+    try:
+        for stmt in stmts:
+            compiler.stmt(stmt, 1)
+    except Unsupported:
+        return None
+
+    header = "def _lox_fn(__frame, __closure):"
+    prologue = [
+        f"    _l{slot} = __frame[{slot}]" for slot in range(len(params))
+    ]
+    body = compiler.lines or ["    pass"]
+    src = "\n".join([header, *prologue, *body, "    return None"])
+
+    namespace = dict(_GLOBALS_BASE)
+    namespace["__ci"] = coerce_int
+    namespace["__nodes"] = compiler.nodes
+    exec(compile(src, f"<lox:{function.name}>", "exec"), namespace)
+    return namespace["_lox_fn"]
@@ -38,6 +38,10 @@ class Node(ABC):
     criar subclasses que implementem os métodos abstratos definidos aqui.
     """
 
+    # Sem atributos próprios: permite que subclasses declaradas com
+    # `@dataclass(slots=True)` dispensem o `__dict__` por instância.
+    __slots__ = ()
+
     def eval(self, ctx):
         name = type(self).__name__
         raise NotImplementedError(f"Método eval não implementado para {name}!")
@@ -55,13 +59,25 @@ class Node(ABC):
             parts.append("\n")
         return "".join(parts)
 
+    def _field_names(self) -> Iterable[str]:
+        """
+        Nomes dos campos públicos do nó, na ordem de declaração.
+
+        Campos com prefixo `_` são caches internos (células de
+        resolução, flags pré-computadas...) e ficam fora da travessia
+        da árvore e da impressão.
+        """
+        for name in self.__annotations__:
+            if not name.startswith("_"):
+                yield name
+
     def is_leaf(self) -> bool:
         """
         Método que verifica se o nó é uma folha na árvore sintática.
 
         Um nó é considerado uma folha se não tem filhos do tipo `Node`.
         """
-        for name in self.__annotations__:
+        for name in self._field_names():
             value = getattr(self, name)
             if isinstance(value, (Node, list, tuple, dict)):
                 return False
@@ -90,7 +106,7 @@ class Node(ABC):
         # O attributo "__annotations__" é um dicionário que contém os nomes dos
         # atributos declarados e seus tipos correspondentes. Vamos pegar os tipos
         # na ordem de declaração e imprimir o nome e valores correspondentes
-        for attr in self.__annotations__:
+        for attr in self._field_names():
             # attr é o nome do atributo. Obtemos o valor do atributo usando a
             # função `getattr` do Python
             value = getattr(self, attr)
@@ -159,7 +175,7 @@ class Node(ABC):
         """
 
         # Primeiro visitamos os filhos do nó atual.
-        for name in self.__annotations__:
+        for name in self._field_names():
             value = getattr(self, name)
             if isinstance(value, Node):
                 value.visit(visitors)
@@ -183,7 +199,7 @@ class Node(ABC):
         do nó atual. Isso é útil para percorrer a árvore sintática de forma
         recursiva.
         """
-        for name in self.__annotations__:
+        for name in self._field_names():
             value = getattr(self, name)
             if isinstance(value, Node):
                 yield value
@@ -203,7 +219,7 @@ class Node(ABC):
         método ajuda a encontrar nós não-tranformados que podem ter escapado seu
         Transformer.
         """
-        for name in self.__annotations__:
+        for name in self._field_names():
             value = getattr(self, name)
             if isinstance(value, (Tree, Token)):
                 yield value
@@ -258,7 +274,7 @@ class Node(ABC):
         O método `replace_child` substitui um filho do nó atual por um novo
         nó. Isso é útil para modificar a árvore sintática de forma recursiva.
         """
-        for name in self.__annotations__:
+        for name in self._field_names():
             value = getattr(self, name)
             if isinstance(value, Node):
                 if value is old:
@@ -512,7 +528,7 @@ def can_print_as_leaf(node: Node) -> bool:
     """
     while node:
         args = []
-        for attr in node.__annotations__:
+        for attr in node._field_names():
             obj = getattr(node, attr)
             if isinstance(obj, (list, tuple)) and obj:
                 return False
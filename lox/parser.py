@@ -0,0 +1,43 @@
+"""
+Implementa o analisador sintático a partir da gramática em
+`grammar.lark`.
+
+Expõe as funções usadas pelo resto do pacote: `lex` (fluxo de tokens),
+`parse_cst` (árvore concreta do lark), `parse` e `parse_expr` (árvore
+abstrata de `lox.ast`, via `LoxTransformer`).
+"""
+
+from pathlib import Path
+from typing import Iterator
+
+from lark import Lark, Token, Tree
+
+from .node import Node
+from .transformer import LoxTransformer
+
+DIR = Path(__file__).parent
+GRAMMAR_PATH = DIR / "grammar.lark"
+
+ast_parser = Lark(
+    GRAMMAR_PATH.read_text(encoding="utf-8"),
+    parser="lalr",
+    start=["program", "expr"],
+)
+
+
+def lex(src: str) -> Iterator[Token]:
+    return ast_parser.lex(src)
+
+
+def parse_cst(src: str, expr: bool = False) -> Tree:
+    return ast_parser.parse(src, start="expr" if expr else "program")
+
+
+def parse(src: str) -> Node:
+    tree = parse_cst(src)
+    return LoxTransformer().transform(tree)
+
+
+def parse_expr(src: str) -> Node:
+    tree = parse_cst(src, expr=True)
+    return LoxTransformer().transform(tree)
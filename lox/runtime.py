@@ -1,12 +1,13 @@
 import builtins
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from operator import add, eq, ge, gt, le, lt, mul, ne, neg, not_, sub, truediv
 from typing import TYPE_CHECKING
 
 from .ctx import Ctx
 
 if TYPE_CHECKING:
-    from .ast import Block, Stmt, Value
+    from .ast import Block, Value
+    from .bytecode import FunctionChunk
 
 __all__ = [
     "add",
@@ -27,6 +28,18 @@ __all__ = [
 ]
 
 
+# Número de chamadas antes de tentar traduzir o corpo compilado de uma
+# função para código Python (ver lox.jit).
+JIT_THRESHOLD = 50
+
+# Pool de dicionários de escopo reutilizáveis (ver `Block.eval`): blocos
+# cuja subárvore comprovadamente não cria clausuras devolvem o escopo
+# aqui ao sair, evitando alocar e descartar um dict por entrada. O
+# tamanho é limitado para o pool não crescer sem fim.
+_scope_pool: list[dict] = []
+_SCOPE_POOL_MAX = 32
+
+
 class LoxInstance:
     """
     Classe base para todos os objetos Lox.
@@ -38,27 +51,113 @@ class LoxFunction:
     """Representa uma função Lox que pode ser chamada."""
     name: str
     params: list[str]
-    body: "Block" 
+    body: "Block"
     closure: Ctx
+    chunk: "FunctionChunk | None" = field(default=None, repr=False)
+    pure: bool = field(default=False, repr=False)
+    _cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _cache_version: int = field(default=-1, init=False, repr=False, compare=False)
+
+    # Pré-computados no __post_init__ para o prólogo da chamada não
+    # recalcular tamanhos a cada invocação.
+    _num_params: int = field(init=False, repr=False, compare=False)
+    _num_locals: int = field(init=False, repr=False, compare=False)
+
+    # JIT: None = ainda não tentado, False = não compilável, senão a
+    # função Python gerada. `_calls` conta chamadas até o limiar.
+    _jit: object = field(default=None, init=False, repr=False, compare=False)
+    _calls: int = field(default=0, init=False, repr=False, compare=False)
+
+    _param_names: tuple = field(init=False, repr=False, compare=False)
+    _dup_params: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._num_params = len(self.params)
+        self._num_locals = self.chunk.num_locals if self.chunk is not None else 0
+        # Nomes extraídos uma única vez na construção (aceita tanto
+        # strings quanto objetos Param), para a ligação dos argumentos
+        # não inspecionar os parâmetros a cada chamada.
+        self._param_names = tuple(getattr(p, "name", p) for p in self.params)
+        self._dup_params = len(set(self._param_names)) != self._num_params
 
     def __call__(self, *args: "Value") -> "Value":
         return self.call(list(args))
 
     def call(self, args: list["Value"]) -> "Value":
 
-        if len(args) != len(self.params):
+        if len(args) != self._num_params:
             raise TypeError(
-                f"Expected {len(self.params)} arguments but got {len(args)}."
+                f"Expected {self._num_params} arguments but got {len(args)}."
             )
 
-
-        ctx = Ctx(scope={}, parent=self.closure)
-
-
-        for param_name, arg_value in zip(self.params, args):
-
-            ctx.var_def(param_name, arg_value)
-
+        # Funções puras (resultado função só dos argumentos, sem efeitos
+        # colaterais) são memoizadas: repetir a chamada vira uma busca
+        # em dicionário. Só argumentos primitivos entram no cache (são
+        # os únicos com hash e igualdade estáveis) e a chave inclui o
+        # tipo para não confundir valores que comparam iguais entre
+        # tipos (1.0, True...).
+        if self.pure and all(
+            isinstance(arg, (bool, int, float, str, type(None))) for arg in args
+        ):
+            # A análise de pureza assume que a ligação global do nome
+            # recursivo não muda; como `var_def` é a única forma de
+            # redefini-la, qualquer avanço no contador global invalida
+            # o cache (mesmo protocolo de `Var._cell`).
+            if self._cache_version != Ctx._defs_version:
+                self._cache.clear()
+                self._cache_version = Ctx._defs_version
+            key = tuple((type(arg), arg) for arg in args)
+            try:
+                return self._cache[key]
+            except KeyError:
+                result = self._call_uncached(args)
+                self._cache[key] = result
+                return result
+
+        return self._call_uncached(args)
+
+    def _call_uncached(self, args: list["Value"]) -> "Value":
+
+        # Caminho rápido: corpo compilado para bytecode com locais em
+        # um vetor de slots, sem alocar Ctx nem dicionário de escopo.
+        # `return` vira o opcode RET, que encerra o laço da VM com o
+        # valor no topo da pilha — nada de levantar/capturar LoxReturn.
+        # Corpos compilados nunca delegam comandos para a árvore, então
+        # a exceção não pode escapar por aqui.
+        if self.chunk is not None:
+            # Funções quentes são traduzidas para código Python (ver
+            # lox.jit): o corpo roda como uma função nativa, sem o laço
+            # de despacho da VM.
+            jit = self._jit
+            if jit:
+                return jit(args, self.closure)
+            if jit is None:
+                self._calls += 1
+                if self._calls >= JIT_THRESHOLD:
+                    from .jit import compile_jit
+
+                    jit = self._jit = compile_jit(self) or False
+                    if jit:
+                        return jit(args, self.closure)
+
+            from .bytecode import VM
+
+            # Os parâmetros ocupam os slots 0..n-1, então a ligação dos
+            # argumentos é uma única atribuição de fatia.
+            frame: list["Value"] = [None] * self._num_locals
+            frame[: self._num_params] = args
+            return VM().run(self.chunk, self.closure, frame)
+
+        if self._dup_params:
+            # Parâmetros duplicados: o laço de `var_def` preserva o
+            # erro de redeclaração do interpretador.
+            ctx = Ctx(scope={}, parent=self.closure)
+            for param_name, arg_value in zip(self._param_names, args):
+                ctx.var_def(param_name, arg_value)
+        else:
+            # Uma alocação de dicionário preenchida em bloco no lugar
+            # de um insert (e um bump de versão) por parâmetro.
+            ctx = Ctx(scope=dict(zip(self._param_names, args)), parent=self.closure)
 
         try:
             self.body.eval(ctx)
@@ -7,7 +7,9 @@ A resolução de vários exercícios requer a modificação ou implementação d
 métodos desta classe.
 """
 
+import sys
 from typing import Callable
+
 from lark import Transformer, v_args
 
 from . import runtime as op
@@ -86,17 +88,11 @@ class LoxTransformer(Transformer):
         return incr
     
     def build_for(self, init, cond, incr, body):
-        if incr is not None:
-            body = Block(stmts=[body, incr])
         if cond is None:
             cond = Literal(value=True)
-        
-        while_loop = While(expr=cond, stmt=body)
-
-        if init is not None and not isinstance(init, Token):
-            return Block(stmts=[init, while_loop])
-        
-        return Block(stmts=[while_loop])
+        if not isinstance(init, Node):
+            init = None
+        return ForLoop(init, cond, incr, body)
 
     # Regras para funções
     def function_def(self, *args):
@@ -163,14 +159,32 @@ class LoxTransformer(Transformer):
     def VAR(self, token):
         return Var(str(token))
 
+    # Literais repetidos viram o mesmo nó: programas usam 0, 1, nil,
+    # true etc. dezenas de vezes e `Literal` nunca é mutado depois de
+    # construído, então compartilhar as instâncias corta alocações no
+    # parse. A chave inclui o tipo para não confundir 1.0 com true.
+    _literal_cache: dict = {}
+
+    def _literal(self, value):
+        key = (type(value), value)
+        try:
+            return self._literal_cache[key]
+        except KeyError:
+            node = self._literal_cache[key] = Literal(value)
+            return node
+
     def NUMBER(self, token):
-        return Literal(float(token))
-    
+        return self._literal(float(token))
+
     def STRING(self, token):
-        return Literal(str(token)[1:-1])
-    
+        text = str(token)[1:-1]
+        if len(text) > 32:
+            # Strings longas tendem a ser únicas; não vale poluir o cache.
+            return Literal(text)
+        return self._literal(sys.intern(text))
+
     def NIL(self, _):
-        return Literal(None)
+        return self._literal(None)
 
     def BOOL(self, token):
-        return Literal(token == "true")
+        return self._literal(token == "true")
@@ -0,0 +1,150 @@
+import contextlib
+import io
+
+from lox import *
+from lox import runtime as op
+from lox.ast import *
+from lox.bytecode import FunctionChunk, Op, compile_program
+
+from lox.ctx import Ctx
+
+
+def make_while_program():
+    # var i = 0; while (i < 3) { print i; i = i + 1; }
+    return Program(
+        [
+            VarDef("i", Literal(0.0)),
+            While(
+                BinOp(Var("i"), Literal(3.0), op.lt),
+                Block(
+                    [
+                        Print(Var("i")),
+                        Assign("i", BinOp(Var("i"), Literal(1.0), op.add)),
+                    ]
+                ),
+            ),
+        ]
+    )
+
+
+class TestCompiler:
+    def test_produz_código_linear(self):
+        chunk = compile_program(make_while_program())
+        assert all(isinstance(x, int) for x in chunk.code)
+        assert len(chunk.code) % 2 == 0
+        assert chunk.code[-2] == Op.RET
+
+    def test_dobra_constantes(self):
+        # 1 + 2 * 3 é computado na compilação, com coerção para int.
+        program = Program([VarDef("x", BinOp(Literal(1.0), BinOp(Literal(2.0), Literal(3.0), op.mul), op.add))])
+        chunk = compile_program(program)
+        ops = chunk.code[::2]
+        assert Op.ADD not in ops and Op.MUL not in ops
+        assert 7 in chunk.consts
+
+    def test_não_dobra_divisão_por_zero(self):
+        program = Program([VarDef("x", BinOp(Literal(1.0), Literal(0.0), op.floordiv))])
+        chunk = compile_program(program)
+        assert Op.DIV in chunk.code[::2]
+
+    def test_condicional_usa_saltos(self):
+        program = Program([If(Literal(False), Print(Literal(1.0)), Print(Literal(2.0)))])
+        chunk = compile_program(program)
+        assert Op.JUMP_IF_FALSE in chunk.code[::2]
+
+
+class TestVM:
+    def eval_program(self, program):
+        ctx = Ctx.from_dict({})
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            result = program.eval(ctx)
+        return result, stdout.getvalue(), ctx
+
+    def test_laço_while(self):
+        result, stdout, ctx = self.eval_program(make_while_program())
+        assert result is None
+        assert stdout == "0\n1\n2\n"
+        assert ctx["i"] == 3
+
+    def test_if_else(self):
+        program = Program([If(Literal(False), Print(Literal(1.0)), Print(Literal(2.0)))])
+        _, stdout, _ = self.eval_program(program)
+        assert stdout == "2\n"
+
+    def test_curto_circuito(self):
+        # var x = nil and f(); não deve chamar f
+        program = Program([VarDef("x", And(Literal(None), Call(Var("f"), [])))])
+        ctx = Ctx.from_dict({"f": lambda: 1 / 0})
+        program.eval(ctx)
+        assert ctx["x"] is None
+
+    def test_função_compilada_para_slots(self):
+        src = """
+        fun fib(n) {
+            if (n < 2) return n;
+            return fib(n - 1) + fib(n - 2);
+        }
+        print fib(10);
+        """
+        program = parse(src)
+        _, stdout, ctx = self.eval_program(program)
+        assert stdout == "55\n"
+        fn = ctx["fib"]
+        assert isinstance(fn.chunk, FunctionChunk)
+        assert fn.chunk.num_locals == 1
+
+    def test_função_aninhada_usa_caminho_de_árvore(self):
+        src = """
+        fun outer() {
+            fun inner() { return 42; }
+            return inner();
+        }
+        print outer();
+        """
+        _, stdout, ctx = self.eval_program(parse(src))
+        assert stdout == "42\n"
+        assert ctx["outer"].chunk is None
+
+    def test_bloco_cria_escopo(self):
+        program = Program([VarDef("x", Literal(1.0)), Block([VarDef("x", Literal(2.0))])])
+        _, _, ctx = self.eval_program(program)
+        assert ctx["x"] == 1
+
+
+class TestJit:
+    def test_função_quente_é_traduzida_para_python(self):
+        src = """
+        fun fib(n) {
+            if (n < 2) return n;
+            return fib(n - 1) + fib(n - 2);
+        }
+        print fib(40);
+        """
+        program = parse(src)
+        ctx = Ctx.from_dict({})
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            program.eval(ctx)
+        assert buf.getvalue() == "102334155\n"
+        # Depois de milhares de chamadas o corpo vira uma função Python.
+        fn = ctx["fib"]
+        assert callable(fn._jit)
+        assert fn(10.0) == 55
+
+
+class TestCSE:
+    def test_subexpressão_pura_repetida_é_computada_uma_vez(self):
+        src = """
+        fun f(a, b) { return a*b + a*b; }
+        print f(3, 4);
+        """
+        program = parse(src)
+        ctx = Ctx.from_dict({})
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf):
+            program.eval(ctx)
+        assert buf.getvalue() == "24\n"
+        code = ctx["f"].chunk.code
+        muls = [op for op in code[::2] if op in (Op.MUL, Op.MUL_NOCOERCE)]
+        assert len(muls) == 1